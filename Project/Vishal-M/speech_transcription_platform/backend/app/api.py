@@ -108,20 +108,22 @@ async def upload_audio_file(
         db.commit()
         db.refresh(transcript)
 
-        # Convert audio to raw PCM using ffmpeg
-        pcm_file_path = tempfile.mktemp(
+        # Convert audio to 16 kHz mono PCM in a WAV container. The header
+        # costs 44 bytes and lets the transcription service read the
+        # duration, which gates the parallel-shard path for long files.
+        wav_file_path = tempfile.mktemp(
             dir=settings.TEMP_STORAGE_PATH,
-            suffix=".pcm"
+            suffix=".wav"
         )
 
         ffmpeg_command = [
             "ffmpeg",
             "-i", temp_file_path,
-            "-f", "s16le",
+            "-f", "wav",
             "-acodec", "pcm_s16le",
             "-ar", "16000",
             "-ac", "1",
-            pcm_file_path
+            wav_file_path
         ]
 
         process = await asyncio.create_subprocess_exec(
@@ -146,7 +148,7 @@ async def upload_audio_file(
         background_tasks.add_task(
             process_transcription_task,
             db,
-            pcm_file_path,
+            wav_file_path,
             transcript.id
         )
 
@@ -27,6 +27,32 @@ class Settings(BaseSettings):
     ENABLE_METRICS: bool = True
     SUPPORTED_LANGUAGES: str = "en-US,hi-IN,es-ES,fr-FR,de-DE"
 
+    # Number of pre-warmed single-shot recognizer sessions kept ready for
+    # the /ws/recognize-once path. 0 disables pre-warming.
+    RECOGNIZER_POOL_SIZE: int = 2
+
+    # Expected ceiling of concurrent recognition streams; sizes the thread
+    # pool used for blocking Speech SDK calls.
+    MAX_CONCURRENT_STREAMS: int = 30
+
+    # Run a throwaway recognition at startup so the first user request does
+    # not pay the Speech service's cold-start latency.
+    WARMUP_ON_START: bool = False
+
+    # Speech SDK latency tuning. Bytes per transmitted audio frame: 3200
+    # (100 ms of 16 kHz 16-bit mono) keeps time-to-first-result low on the
+    # streaming paths; files use 1 s frames for throughput. The service
+    # ignores the property for microphone input. Segmentation silence is
+    # how long the service waits before closing an utterance.
+    STREAM_BYTES_PER_FRAME: int = 3200
+    FILE_BYTES_PER_FRAME: int = 32000
+    SEGMENTATION_SILENCE_MS: int = 300
+
+    # Transcribe uploaded files through the Speech REST API (server-side,
+    # faster than real-time) instead of streaming them at 1x real-time
+    # through continuous recognition.
+    USE_REST_TRANSCRIPTION: bool = False
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,9 +14,19 @@ from datetime import datetime
 
 from sqlalchemy import text
 
+try:
+    # libuv-backed event loop: roughly 2x faster than the default selector
+    # loop on this workload (thread-to-loop wakeups from SDK callbacks plus
+    # many short coroutines). Unavailable on Windows dev machines.
+    import uvloop
+    uvloop.install()
+except ImportError:
+    uvloop = None
+
 from .database import engine, Base, DATABASE_URL
 from .config import get_settings
 from .logger import setup_logging, get_logger
+from .transcription import transcription_service
 from . import api, websocket, schemas
 
 settings = get_settings()
@@ -40,11 +51,19 @@ async def lifespan(app: FastAPI):
 
         # Create temp upload directory
         os.makedirs(settings.TEMP_STORAGE_PATH, exist_ok=True)
+
+        # Pay the Speech service's cold-start cost at boot, not on the
+        # first user request. Runs in the background so startup is not
+        # blocked on Azure.
+        if settings.WARMUP_ON_START:
+            asyncio.get_running_loop().create_task(transcription_service.warmup())
         yield
     except Exception as e:
         logger.error("startup_failed", error=str(e))
         raise
     finally:
+        # Release pooled HTTP connections and executors held by the service
+        await transcription_service.aclose()
         logger.info("application_shutdown")
 
 app = FastAPI(
@@ -1,6 +1,24 @@
 import azure.cognitiveservices.speech as speechsdk
 import asyncio
-from typing import Dict, Optional, List
+try:
+    # Removed from the stdlib in Python 3.13. The runtime is pinned to
+    # 3.10/3.11, but guard anyway so a base-image bump degrades to
+    # unsharded file transcription instead of failing at import.
+    import audioop
+except ImportError:
+    audioop = None
+import collections
+import concurrent.futures
+import functools
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+import wave
+from typing import Dict, Optional, List, Tuple
+import httpx
 from .config import get_settings
 from .logger import get_logger
 import time
@@ -8,121 +26,859 @@ import time
 settings = get_settings()
 logger = get_logger(__name__)
 
+# The module-level singleton below is the one shared service instance;
+# anything else importing from here should stick to this surface.
+__all__ = [
+    "TranscriptionService",
+    "transcription_service",
+    "BoundedPushInputStream",
+    "QueuePullAudioStream",
+    "FdPullAudioStream",
+    "OnceSession",
+]
+
+# structlog drops below-level records cheaply, but the kwargs (and any
+# attribute access through the SDK's native layer) are still evaluated at
+# the call site. Handlers run per recognition event, so they check this
+# flag before doing any debug-only formatting.
+_DEBUG_LOGGING = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO) <= logging.DEBUG
+
+@functools.lru_cache(maxsize=8)
+def _auto_detect_config(languages: Tuple[str, ...]) -> speechsdk.AutoDetectSourceLanguageConfig:
+    """
+    Cached AutoDetectSourceLanguageConfig keyed by the language tuple, so
+    repeated service instantiations (reloads, tests) share one native
+    config object per language set.
+    """
+    return speechsdk.AutoDetectSourceLanguageConfig(languages=list(languages))
+
+# Formats the SDK would otherwise decompress inline on its own thread
+_COMPRESSED_SUFFIXES = frozenset({".mp3", ".m4a", ".ogg", ".flac", ".webm", ".opus"})
+
+# Files shorter than this are transcribed sequentially; the silence search
+# and extra sessions are not worth it for short clips.
+_SHARD_MIN_SECONDS = 30.0
+_SHARD_CHUNK_SECONDS = 60.0
+_SHARD_SEARCH_SECONDS = 5.0
+
+def _wav_duration(file_path: str) -> Optional[float]:
+    """ Duration of a PCM WAV file in seconds, or None if it is not one. """
+    try:
+        with wave.open(file_path, "rb") as wav:
+            framerate = wav.getframerate()
+            return wav.getnframes() / framerate if framerate else None
+    except (wave.Error, EOFError, OSError):
+        return None
+
+def _split_wav_on_silence(
+    wav_path: str,
+    chunk_seconds: float = _SHARD_CHUNK_SECONDS,
+    search_seconds: float = _SHARD_SEARCH_SECONDS
+) -> List[str]:
+    """
+    Cuts a PCM WAV into roughly chunk_seconds pieces, placing each cut at
+    the quietest 30 ms window (lowest RMS) within +/- search_seconds of the
+    nominal boundary so phrases are not split mid-word. Returns the chunk
+    temp-file paths, in order; the caller owns and must delete them.
+    Module-level so it can run in the decode process pool.
+    """
+    with wave.open(wav_path, "rb") as wav:
+        n_channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        framerate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    bytes_per_frame = n_channels * sample_width
+    total_frames = len(frames) // bytes_per_frame
+    window_frames = max(int(0.03 * framerate), 1)
+    chunk_frames = int(chunk_seconds * framerate)
+    search_frames = int(search_seconds * framerate)
+
+    def rms_at(frame_idx: int) -> int:
+        start = frame_idx * bytes_per_frame
+        end = start + window_frames * bytes_per_frame
+        return audioop.rms(frames[start:end], sample_width)
+
+    boundaries = [0]
+    target = chunk_frames
+    while target < total_frames - chunk_frames // 2:
+        lo = max(boundaries[-1] + window_frames, target - search_frames)
+        hi = min(total_frames - window_frames, target + search_frames)
+        best = min(range(lo, hi, window_frames), key=rms_at)
+        boundaries.append(best)
+        target = best + chunk_frames
+    boundaries.append(total_frames)
+
+    chunk_paths: List[str] = []
+    try:
+        for start, end in zip(boundaries, boundaries[1:]):
+            fd, chunk_path = tempfile.mkstemp(
+                dir=settings.TEMP_STORAGE_PATH,
+                suffix=".wav"
+            )
+            os.close(fd)
+            with wave.open(chunk_path, "wb") as chunk:
+                chunk.setnchannels(n_channels)
+                chunk.setsampwidth(sample_width)
+                chunk.setframerate(framerate)
+                chunk.writeframes(
+                    frames[start * bytes_per_frame:end * bytes_per_frame]
+                )
+            chunk_paths.append(chunk_path)
+    except Exception:
+        for chunk_path in chunk_paths:
+            if os.path.exists(chunk_path):
+                os.remove(chunk_path)
+        raise
+    return chunk_paths
+
+def _ffmpeg_to_pcm16k(src_path: str) -> str:
+    """
+    Decodes an audio file into 16 kHz mono 16-bit WAV with ffmpeg and
+    returns the temp-file path. Module-level so it can run in the decode
+    process pool. The caller owns (and must delete) the returned file.
+    """
+    fd, dst_path = tempfile.mkstemp(
+        dir=settings.TEMP_STORAGE_PATH,
+        suffix=".wav"
+    )
+    os.close(fd)
+    completed = subprocess.run(
+        [
+            "ffmpeg", "-y",
+            "-i", src_path,
+            "-acodec", "pcm_s16le",
+            "-ar", "16000",
+            "-ac", "1",
+            dst_path
+        ],
+        capture_output=True
+    )
+    if completed.returncode != 0:
+        if os.path.exists(dst_path):
+            os.remove(dst_path)
+        raise RuntimeError(
+            f"ffmpeg decode failed for {src_path}: {completed.stderr.decode(errors='replace')[-500:]}"
+        )
+    return dst_path
+
+def _supported_language_tuple() -> Tuple[str, ...]:
+    # Strip whitespace so "en-US, hi-IN" in the env file does not silently
+    # produce an invalid locale.
+    return tuple(
+        lang.strip()
+        for lang in settings.SUPPORTED_LANGUAGES.split(',')
+        if lang.strip()
+    )
+
+class BoundedPushInputStream:
+    """
+    FIFO-bounded facade over a PushAudioInputStream.
+
+    The Speech SDK buffers pushed audio internally and aborts with "client
+    buffer exceeded maximum size" when the producer outruns the service.
+    This wrapper tracks bytes written against the audio positions the
+    service has confirmed (via recognized-event offsets) and drops incoming
+    chunks once more than max_buffered_seconds of audio is pending, keeping
+    memory and latency bounded during service slowdowns.
+    """
+    def __init__(
+        self,
+        stream: speechsdk.audio.PushAudioInputStream,
+        max_buffered_seconds: float = 30.0,
+        bytes_per_second: int = 32000  # 16 kHz, 16-bit, mono
+    ):
+        self.azure_stream = stream
+        self._bytes_per_second = bytes_per_second
+        self._max_pending = int(max_buffered_seconds * bytes_per_second)
+        self._written = 0
+        self._consumed = 0
+
+    def write(self, data: bytes) -> bool:
+        """ Pushes a chunk; returns False if it was dropped due to overflow. """
+        if self._written - self._consumed + len(data) > self._max_pending:
+            logger.warning(
+                "audio_buffer_overflow_chunk_dropped",
+                pending_bytes=self._written - self._consumed,
+                chunk_bytes=len(data)
+            )
+            return False
+        self.azure_stream.write(data)
+        self._written += len(data)
+        return True
+
+    def mark_consumed(self, offset_ticks: int):
+        """ Credits audio up to the given result offset (100 ns ticks). """
+        consumed = int(offset_ticks * self._bytes_per_second // 10_000_000)
+        if consumed > self._consumed:
+            self._consumed = consumed
+
+    def close(self):
+        self.azure_stream.close()
+
+class _FileRecognitionState:
+    """
+    Per-file recognition state whose bound methods serve as the SDK event
+    handlers. Handlers fire on SDK threads at phrase rate; binding them
+    once here avoids allocating fresh closures/lambdas per session and
+    per-event nonlocal cell lookups.
+    """
+    __slots__ = ("file_path", "loop", "queue", "detected_language")
+
+    def __init__(self, file_path: str, loop: asyncio.AbstractEventLoop):
+        self.file_path = file_path
+        self.loop = loop
+        # Results cross from SDK threads to the generator through this queue
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.detected_language: Optional[str] = None
+
+    def _emit(self, payload: dict):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, payload)
+
+    def on_recognized(self, evt):
+        if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            if not self.detected_language: # Capture language from the first result
+                try:
+                    auto_detect_result = speechsdk.AutoDetectSourceLanguageResult(evt.result)
+                    self.detected_language = auto_detect_result.language
+                except Exception as lang_err:
+                    logger.warning("Could not extract language from first result", error=str(lang_err))
+                    self.detected_language = "unknown" # Fallback
+
+            if _DEBUG_LOGGING:
+                # Latency comes straight from the result properties; never
+                # parse (or eval) evt.result.json just to read one field.
+                latency_ms = evt.result.properties.get(
+                    speechsdk.PropertyId.SpeechServiceResponse_RecognitionLatencyMs
+                )
+                logger.debug(
+                    "recognized_chunk",
+                    text=evt.result.text,
+                    file_path=self.file_path,
+                    latency_ms=latency_ms
+                )
+            self._emit({
+                "language": self.detected_language,
+                "text": evt.result.text,
+                "status": "recognized",
+                "error": None
+            })
+
+    def on_canceled(self, evt):
+        cancellation = evt.cancellation_details
+        error_msg = f"Recognition canceled: {cancellation.reason}"
+        if cancellation.reason == speechsdk.CancellationReason.Error:
+            error_msg += f" - Details: {cancellation.error_details}"
+        logger.error(f"Transcription failed for {self.file_path}: {error_msg}")
+        self._emit({
+            "language": self.detected_language,
+            "text": None,
+            "status": "error",
+            "error": error_msg
+        })
+
+    def on_session_stopped(self, evt):
+        logger.info(f"Session stopped for {self.file_path}. Reason: {evt}")
+        self._emit({
+            "language": self.detected_language,
+            "text": None,
+            "status": "stopped",
+            "error": None
+        })
+
+    def on_session_started(self, evt):
+        # str(evt) stringifies a native SDK object; only pay for it when
+        # debug logging is on.
+        if _DEBUG_LOGGING:
+            logger.debug("session_started", file_path=self.file_path, event=str(evt))
+        else:
+            logger.info("session_started", file_path=self.file_path)
+
+class _DequePullCallback(speechsdk.audio.PullAudioInputStreamCallback):
+    """
+    Pull-stream callback backed by a thread-safe deque. The SDK calls
+    read() on its own thread and blocks here until audio is available, so
+    it consumes at exactly the rate it can handle; the producer side stays
+    bounded by dropping the oldest chunk on overflow.
+    """
+    def __init__(self, max_buffered_bytes: int):
+        super().__init__()
+        self._chunks: collections.deque = collections.deque()
+        self._available = threading.Condition()
+        self._buffered = 0
+        self._max_buffered = max_buffered_bytes
+        self._ended = False
+
+    def feed(self, data: bytes):
+        with self._available:
+            while self._buffered + len(data) > self._max_buffered and self._chunks:
+                dropped = self._chunks.popleft()
+                self._buffered -= len(dropped)
+                logger.warning("audio_buffer_overflow_chunk_dropped", chunk_bytes=len(dropped))
+            # Stored as memoryview so read() can split a chunk across SDK
+            # frame boundaries without copying the remainder each time.
+            self._chunks.append(memoryview(data))
+            self._buffered += len(data)
+            self._available.notify()
+
+    def end(self):
+        """ Signals end of audio; read() returns 0 once drained. """
+        with self._available:
+            self._ended = True
+            self._available.notify_all()
+
+    def read(self, buffer: memoryview) -> int:
+        with self._available:
+            while not self._chunks and not self._ended:
+                self._available.wait()
+            filled = 0
+            while self._chunks and filled < len(buffer):
+                chunk = self._chunks.popleft()
+                take = min(len(chunk), len(buffer) - filled)
+                buffer[filled:filled + take] = chunk[:take]
+                filled += take
+                if take < len(chunk):
+                    self._chunks.appendleft(chunk[take:]) # zero-copy view
+                self._buffered -= take
+            return filled # 0 only after end(), which the SDK treats as EOF
+
+    def close(self):
+        self.end()
+
+class QueuePullAudioStream:
+    """
+    Pull-mode audio source for WebSocket producers. Exposes the same
+    write()/close() surface as BoundedPushInputStream so handlers can swap
+    it in, but inverts control: instead of us pushing bytes at the SDK
+    (and overflowing its client buffer past 1x real-time), the SDK pulls
+    from the internal queue at its own pace.
+    """
+    def __init__(
+        self,
+        audio_format: Optional[speechsdk.audio.AudioStreamFormat] = None,
+        max_buffered_seconds: float = 30.0,
+        bytes_per_second: int = 32000  # 16 kHz, 16-bit, mono
+    ):
+        self._callback = _DequePullCallback(
+            int(max_buffered_seconds * bytes_per_second)
+        )
+        if audio_format is not None:
+            self.azure_stream = speechsdk.audio.PullAudioInputStream(
+                self._callback, audio_format
+            )
+        else:
+            self.azure_stream = speechsdk.audio.PullAudioInputStream(self._callback)
+
+    def write(self, data: bytes):
+        self._callback.feed(data)
+
+    def close(self):
+        self._callback.end()
+
+class _FdPullCallback(speechsdk.audio.PullAudioInputStreamCallback):
+    """
+    Pull callback that reads decoded PCM straight from a pipe file
+    descriptor on the SDK's thread. os.readv fills the SDK-owned buffer
+    in one syscall, so the audio never crosses the event loop and there
+    is no intermediate userland copy.
+    """
+    def __init__(self, fd: int):
+        super().__init__()
+        self._fd = fd
+        self._closed = False
+
+    def read(self, buffer: memoryview) -> int:
+        try:
+            return os.readv(self._fd, [buffer])
+        except OSError:
+            return 0 # Treated as EOF by the SDK
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+
+class FdPullAudioStream:
+    """
+    Pull-mode audio source reading from an OS pipe fd (Linux fast path
+    for the ffmpeg decode leg). Exposes the same azure_stream/close
+    surface as QueuePullAudioStream; there is no write() because the
+    producer is the process on the other end of the pipe. Takes ownership
+    of the fd and closes it on close().
+    """
+    def __init__(
+        self,
+        fd: int,
+        audio_format: Optional[speechsdk.audio.AudioStreamFormat] = None,
+    ):
+        self._callback = _FdPullCallback(fd)
+        if audio_format is not None:
+            self.azure_stream = speechsdk.audio.PullAudioInputStream(
+                self._callback, audio_format
+            )
+        else:
+            self.azure_stream = speechsdk.audio.PullAudioInputStream(self._callback)
+
+    def close(self):
+        self._callback.close()
+
+class OnceSession:
+    """
+    A single-shot recognition session: a PushAudioInputStream already bound
+    to a SpeechRecognizer whose WebSocket connection has been opened ahead
+    of time. Sessions are single-use — recognize_once consumes the stream —
+    so pooling them moves recognizer construction and the TLS/WebSocket
+    handshake off the request path rather than reusing live connections.
+    """
+    def __init__(self, speech_config: speechsdk.SpeechConfig,
+                 auto_detect_config: speechsdk.AutoDetectSourceLanguageConfig):
+        self.stream = speechsdk.audio.PushAudioInputStream()
+        audio_config = speechsdk.audio.AudioConfig(stream=self.stream)
+        self.recognizer = speechsdk.SpeechRecognizer(
+            speech_config=speech_config,
+            auto_detect_source_language_config=auto_detect_config,
+            audio_config=audio_config
+        )
+        # Pre-open the connection to Azure so the first audio frame does not
+        # pay the TLS + WebSocket handshake (150-300 ms, several seconds cold).
+        self._connection = speechsdk.Connection.from_recognizer(self.recognizer)
+        try:
+            self._connection.open(for_continuous_recognition=False)
+        except Exception as conn_err:
+            # Recognition still works without the pre-opened connection
+            logger.warning("recognizer_prewarm_failed", error=str(conn_err))
+
 class TranscriptionService:
     def __init__(self):
         self.speech_key = settings.SPEECH_KEY
         self.service_region = settings.SERVICE_REGION
         # Supported languages for auto-detection, loaded from settings
-        supported_languages = settings.SUPPORTED_LANGUAGES.split(',')
-        self.auto_detect_config = speechsdk.AutoDetectSourceLanguageConfig(
-            languages=supported_languages
-        )
-    
-    def _get_speech_config(self) -> speechsdk.SpeechConfig:
-        config = speechsdk.SpeechConfig(
+        supported_languages = _supported_language_tuple()
+        self.supported_languages = list(supported_languages)
+        self.auto_detect_config = _auto_detect_config(supported_languages)
+        # SpeechConfig construction crosses into the native SDK; build it once
+        # and reuse it for every recognition (we never mutate it per request).
+        self._speech_config = speechsdk.SpeechConfig(
             subscription=self.speech_key,
             region=self.service_region
         )
         # Enable detailed output format for more info if needed later
-        # config.output_format = speechsdk.OutputFormat.DetailedSpeech
-        return config
+        # self._speech_config.output_format = speechsdk.OutputFormat.DetailedSpeech
+
+        # Latency profile for the streaming paths: small transmission frames
+        # and a short end-of-utterance silence timeout. Defaults are tuned
+        # in config.py; mic input ignores the frame-size property.
+        self._speech_config.set_property_by_name(
+            "SPEECH-BytesPerFrame", str(settings.STREAM_BYTES_PER_FRAME)
+        )
+        self._speech_config.set_property(
+            speechsdk.PropertyId.Speech_SegmentationSilenceTimeoutMs,
+            str(settings.SEGMENTATION_SILENCE_MS)
+        )
+
+        # File transcription locks the detected language on the first result
+        # anyway, so run language ID once at the start of the audio instead
+        # of re-running it for every phrase of a long file.
+        self._file_speech_config = speechsdk.SpeechConfig(
+            subscription=self.speech_key,
+            region=self.service_region
+        )
+        self._file_speech_config.set_property(
+            speechsdk.PropertyId.SpeechServiceConnection_LanguageIdMode,
+            "AtStart"
+        )
+        # Files favour throughput over time-to-first-result: 1 s frames
+        self._file_speech_config.set_property_by_name(
+            "SPEECH-BytesPerFrame", str(settings.FILE_BYTES_PER_FRAME)
+        )
+
+        # Pool of pre-warmed single-shot sessions; filled lazily so that
+        # importing the module never blocks on network I/O.
+        self._session_pool: "asyncio.Queue[OnceSession]" = asyncio.Queue(
+            maxsize=max(settings.RECOGNIZER_POOL_SIZE, 1)
+        )
+        self._replenishing = False
+
+        # Shared HTTP client for REST calls (created lazily so the module
+        # can be imported without a running event loop).
+        self._http: Optional[httpx.AsyncClient] = None
+
+        # Dedicated executor for blocking Speech SDK calls. Using the loop's
+        # default executor would let concurrent transcriptions starve every
+        # other run_in_executor caller in the process.
+        self._sdk_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=settings.MAX_CONCURRENT_STREAMS,
+            thread_name_prefix="azure-sdk"
+        )
+
+        # Process pool for CPU-bound audio decoding, created on first use so
+        # idle workers are not forked at import time.
+        self._decode_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    def _get_speech_config(self) -> speechsdk.SpeechConfig:
+        return self._speech_config
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_keepalive_connections=20,
+                    max_connections=100,
+                    keepalive_expiry=30.0
+                ),
+                timeout=httpx.Timeout(300.0, connect=20.0)
+            )
+        return self._http
+
+    async def warmup(self):
+        """
+        Performs a throwaway recognition on one second of silence so the
+        TLS/WebSocket setup and the service's cold start (several seconds on
+        the first request against a region) are paid at boot time. Also
+        primes the once-session pool as a side effect.
+        """
+        try:
+            stream = speechsdk.audio.PushAudioInputStream()
+            stream.write(b"\x00" * 32000) # 1 s of 16 kHz 16-bit mono silence
+            stream.close()
+            result = await self.recognize_from_stream(stream)
+            logger.info("azure_stt_warmup_completed", status=result.get("status"))
+            self._schedule_replenish()
+        except Exception as e:
+            logger.warning("azure_stt_warmup_failed", error=str(e))
+
+    async def aclose(self):
+        """
+        Releases pooled resources (HTTP keep-alive connections, executors).
+        Called from the application shutdown hook.
+        """
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        self._sdk_executor.shutdown(wait=False)
+        if self._decode_pool is not None:
+            self._decode_pool.shutdown(wait=False)
+            self._decode_pool = None
+
+    def _get_decode_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._decode_pool is None:
+            self._decode_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=os.cpu_count()
+            )
+        return self._decode_pool
+
+    def _build_once_session(self) -> OnceSession:
+        return OnceSession(self._get_speech_config(), self.auto_detect_config)
+
+    async def acquire_once_session(self) -> OnceSession:
+        """ Takes a pre-warmed session from the pool, or builds one inline. """
+        try:
+            session = self._session_pool.get_nowait()
+        except asyncio.QueueEmpty:
+            loop = asyncio.get_event_loop()
+            session = await loop.run_in_executor(self._sdk_executor, self._build_once_session)
+        self._schedule_replenish()
+        return session
+
+    def _schedule_replenish(self):
+        if settings.RECOGNIZER_POOL_SIZE > 0 and not self._replenishing:
+            self._replenishing = True
+            asyncio.ensure_future(self._replenish_pool())
+
+    async def _replenish_pool(self):
+        try:
+            loop = asyncio.get_event_loop()
+            while self._session_pool.qsize() < settings.RECOGNIZER_POOL_SIZE:
+                session = await loop.run_in_executor(self._sdk_executor, self._build_once_session)
+                self._session_pool.put_nowait(session)
+        except Exception as e:
+            logger.warning("session_pool_replenish_failed", error=str(e))
+        finally:
+            self._replenishing = False
     
     async def transcribe_file(self, file_path: str) -> Dict[str, Optional[str]]:
         """
-        Transcribes a potentially long audio file using continuous recognition.
-        Accumulates results until the end of the audio stream.
+        Transcribes a potentially long audio file.
+
+        When USE_REST_TRANSCRIPTION is enabled the file is uploaded to the
+        Speech REST API, which transcribes server-side at many times
+        real-time. Otherwise (default) the file is streamed through
+        continuous recognition at 1x real-time.
+        """
+        if settings.USE_REST_TRANSCRIPTION:
+            try:
+                return await self._transcribe_file_rest(file_path)
+            except Exception as e:
+                logger.warning(
+                    "rest_transcription_failed_falling_back",
+                    file_path=file_path, error=str(e)
+                )
+
+        # Long PCM WAV files are split at silence and recognized in parallel;
+        # continuous recognition is otherwise paced at 1x real-time.
+        duration = _wav_duration(file_path)
+        if audioop is not None and duration is not None and duration >= _SHARD_MIN_SECONDS:
+            try:
+                return await self._transcribe_file_sharded(file_path)
+            except Exception as e:
+                logger.warning(
+                    "sharded_transcription_failed_falling_back",
+                    file_path=file_path, error=str(e)
+                )
+
+        return await self._transcribe_file_continuous(file_path)
+
+    async def _transcribe_file_sharded(self, file_path: str) -> Dict[str, Optional[str]]:
+        """
+        Splits a long WAV at silence boundaries and runs the chunks through
+        concurrent recognition sessions, then stitches the text back in
+        order. Wall time drops from audio duration to roughly the longest
+        chunk (sessions capped at MAX_CONCURRENT_STREAMS).
+        """
+        loop = asyncio.get_running_loop()
+        chunk_paths = await loop.run_in_executor(
+            self._get_decode_pool(), _split_wav_on_silence, file_path
+        )
+        if len(chunk_paths) < 2:
+            for chunk_path in chunk_paths:
+                os.remove(chunk_path)
+            return await self._transcribe_file_continuous(file_path)
+
+        logger.info(
+            "transcription_started (sharded)",
+            file_path=file_path, chunks=len(chunk_paths)
+        )
+
+        semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_STREAMS)
+
+        async def transcribe_chunk(chunk_path: str) -> Dict[str, Optional[str]]:
+            async with semaphore:
+                return await self._transcribe_file_continuous(chunk_path)
+
+        try:
+            results = await asyncio.gather(
+                *(transcribe_chunk(chunk_path) for chunk_path in chunk_paths)
+            )
+        finally:
+            for chunk_path in chunk_paths:
+                if os.path.exists(chunk_path):
+                    os.remove(chunk_path)
+
+        texts = [r["text"] for r in results if r["text"]]
+        detected_language = next(
+            (r["language"] for r in results if r["language"] and r["language"] != "unknown"),
+            "unknown"
+        )
+        errors = [r["error"] for r in results if r["status"] == "failed"]
+
+        if errors:
+            return {
+                "language": detected_language,
+                "text": " ".join(texts) if texts else None,
+                "status": "failed",
+                "error": "; ".join(errors)
+            }
+        if not texts:
+            logger.warning("no_speech_detected (sharded)", file_path=file_path)
+            return {
+                "language": detected_language,
+                "text": None,
+                "status": "no_speech",
+                "error": "No speech detected in audio"
+            }
+
+        final_text = " ".join(texts)
+        logger.info(
+            "transcription_completed (sharded)",
+            language=detected_language,
+            text_length=len(final_text),
+            chunks=len(chunk_paths),
+            file_path=file_path
+        )
+        return {
+            "language": detected_language,
+            "text": final_text,
+            "status": "completed",
+            "error": None
+        }
+
+    async def _transcribe_file_rest(self, file_path: str) -> Dict[str, Optional[str]]:
+        """
+        Transcribes a file via the Speech fast-transcription REST endpoint.
+        The audio is uploaded directly in the request body (no blob storage
+        involved) and the response is returned synchronously, so there is no
+        polling loop.
+        """
+        logger.info("transcription_started (rest)", file_path=file_path)
+
+        url = (
+            f"https://{self.service_region}.api.cognitive.microsoft.com"
+            "/speechtotext/transcriptions:transcribe?api-version=2024-11-15"
+        )
+        definition = {"locales": self.supported_languages}
+
+        client = self._get_http_client()
+        with open(file_path, "rb") as audio_file:
+            response = await client.post(
+                url,
+                headers={"Ocp-Apim-Subscription-Key": self.speech_key},
+                files={
+                    "audio": (os.path.basename(file_path), audio_file, "application/octet-stream"),
+                    "definition": (None, json.dumps(definition), "application/json"),
+                },
+            )
+        response.raise_for_status()
+        payload = response.json()
+
+        phrases = payload.get("phrases") or []
+        combined = payload.get("combinedPhrases") or []
+        final_text = " ".join(p["text"] for p in combined if p.get("text")) or None
+        detected_language = phrases[0].get("locale") if phrases else None
+
+        if not final_text:
+            logger.warning("no_speech_detected (rest)", file_path=file_path)
+            return {
+                "language": detected_language or "unknown",
+                "text": None,
+                "status": "no_speech",
+                "error": "No speech detected in audio"
+            }
+
+        logger.info(
+            "transcription_completed (rest)",
+            language=detected_language,
+            text_length=len(final_text),
+            file_path=file_path
+        )
+        return {
+            "language": detected_language or "unknown",
+            "text": final_text,
+            "status": "completed",
+            "error": None
+        }
+
+    async def transcribe_file_stream(self, file_path: str):
+        """
+        Async generator that transcribes a file using continuous recognition
+        and yields each recognized phrase as soon as the SDK reports it.
+
+        Yields dicts shaped like the WebSocket callback payloads
+        ({"language", "text", "status", "error"}); the final item has status
+        "stopped" (clean end of audio) or "error". Callers get time-to-first-
+        phrase latency instead of waiting for the whole file.
         """
         logger.info("transcription_started (continuous)", file_path=file_path)
-        
-        speech_config = self._get_speech_config()
+
+        # Decode compressed formats in the process pool first; otherwise the
+        # SDK decompresses inline on its (shared) recognition thread.
+        decoded_path: Optional[str] = None
+        if os.path.splitext(file_path)[1].lower() in _COMPRESSED_SUFFIXES:
+            decoded_path = await asyncio.get_running_loop().run_in_executor(
+                self._get_decode_pool(), _ffmpeg_to_pcm16k, file_path
+            )
+            file_path = decoded_path
+
+        speech_config = self._file_speech_config
         audio_config = speechsdk.AudioConfig(filename=file_path)
-        
+
         recognizer = speechsdk.SpeechRecognizer(
             speech_config=speech_config,
             auto_detect_source_language_config=self.auto_detect_config,
             audio_config=audio_config
         )
 
-        all_results: List[str] = []
-        detected_language: Optional[str] = None
-        done = asyncio.Event()
-        error_message: Optional[str] = None
+        state = _FileRecognitionState(file_path, asyncio.get_running_loop())
+        loop = state.loop
+
+        # Connect handlers (bound methods, allocated once per file rather
+        # than per event; the SDK invokes them on its own threads)
+        recognizer.recognized.connect(state.on_recognized)
+        recognizer.canceled.connect(state.on_canceled)
+        recognizer.session_stopped.connect(state.on_session_stopped)
+        recognizer.session_started.connect(state.on_session_started)
 
-        def recognized_handler(evt):
-            nonlocal detected_language
-            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                if not detected_language: # Capture language from the first result
-                    try:
-                         auto_detect_result = speechsdk.AutoDetectSourceLanguageResult(evt.result)
-                         detected_language = auto_detect_result.language
-                    except Exception as lang_err:
-                         logger.warning("Could not extract language from first result", error=str(lang_err))
-                         detected_language = "unknown" # Fallback
-
-                all_results.append(evt.result.text)
-                logger.debug(f"Recognized chunk: {evt.result.text}", file_path=file_path)
-
-        def canceled_handler(evt):
-            nonlocal error_message
-            cancellation = evt.cancellation_details
-            error_msg = f"Recognition canceled: {cancellation.reason}"
-            if cancellation.reason == speechsdk.CancellationReason.Error:
-                error_msg += f" - Details: {cancellation.error_details}"
-            logger.error(f"Transcription failed for {file_path}: {error_msg}")
-            error_message = error_msg
-            done.set() # Signal completion on error
-
-        def session_stopped_handler(evt):
-            logger.info(f"Session stopped for {file_path}. Reason: {evt}")
-            done.set() # Signal completion when the audio stream ends
-
-        # Connect handlers
-        recognizer.recognized.connect(recognized_handler)
-        recognizer.canceled.connect(canceled_handler)
-        recognizer.session_stopped.connect(session_stopped_handler)
-        recognizer.session_started.connect(lambda evt: logger.info(f"Session started for {file_path}", event=str(evt)))
-        
-        loop = asyncio.get_event_loop()
         try:
             # Start continuous recognition (non-blocking)
-            await loop.run_in_executor(None, recognizer.start_continuous_recognition)
+            await loop.run_in_executor(self._sdk_executor, recognizer.start_continuous_recognition)
 
-            # Wait until the session stops (or cancellation occurs)
-            await done.wait()
+            # Drain events until the session stops (or cancellation occurs)
+            while True:
+                event = await state.queue.get()
+                yield event
+                if event["status"] in ("stopped", "error"):
+                    break
 
         except Exception as e:
             logger.exception(f"Exception during continuous file transcription for {file_path}: {e}")
-            error_message = f"Runtime error during transcription: {str(e)}"
+            yield {
+                "language": state.detected_language,
+                "text": None,
+                "status": "error",
+                "error": f"Runtime error during transcription: {str(e)}"
+            }
         finally:
             # Ensure stop is attempted even on exception
             try:
-                await loop.run_in_executor(None, recognizer.stop_continuous_recognition)
+                await loop.run_in_executor(self._sdk_executor, recognizer.stop_continuous_recognition)
                 logger.info(f"Continuous recognition stopped for {file_path}")
             except Exception as stop_err:
                 logger.error(f"Error stopping recognizer for {file_path}", error=str(stop_err))
+            if decoded_path and os.path.exists(decoded_path):
+                os.remove(decoded_path)
+
+    async def _transcribe_file_continuous(self, file_path: str) -> Dict[str, Optional[str]]:
+        """
+        Transcribes a potentially long audio file using continuous recognition.
+        Thin wrapper over transcribe_file_stream that accumulates the yielded
+        phrases into a single result dict.
+        """
+        all_results: List[str] = []
+        text_length = 0 # Running total so the final text is never re-measured
+        detected_language: Optional[str] = None
+        error_message: Optional[str] = None
+
+        async for event in self.transcribe_file_stream(file_path):
+            if event["language"]:
+                detected_language = event["language"]
+            if event["status"] == "recognized":
+                all_results.append(event["text"])
+                text_length += len(event["text"]) + 1 # +1 for the joining space
+            elif event["status"] == "error":
+                error_message = event["error"]
 
         # --- Process results ---
-        if error_message:
+        # Fast paths first: no join work when there is nothing to join
+        if not all_results:
+            if error_message:
+                return {
+                    "language": detected_language or "unknown",
+                    "text": None,
+                    "status": "failed",
+                    "error": error_message
+                }
+            logger.warning("no_speech_detected (continuous)", file_path=file_path)
+            return {
+                "language": detected_language or "unknown", # Language might be detected even with no speech
+                "text": None,
+                "status": "no_speech",
+                "error": "No speech detected in audio"
+            }
+        elif error_message:
             return {
                 "language": detected_language or "unknown",
-                "text": " ".join(all_results) if all_results else None, # Return partial text if any
+                "text": " ".join(all_results), # Return partial text if any
                 "status": "failed",
                 "error": error_message
             }
-        elif not all_results:
-             logger.warning("no_speech_detected (continuous)", file_path=file_path)
-             return {
-                 "language": detected_language or "unknown", # Language might be detected even with no speech
-                 "text": None,
-                 "status": "no_speech",
-                 "error": "No speech detected in audio"
-             }
         else:
             final_text = " ".join(all_results)
             logger.info(
                 "transcription_completed (continuous)",
                 language=detected_language,
-                text_length=len(final_text),
+                text_length=text_length - 1, # Running sum; avoids re-measuring the joined text
                 file_path=file_path
             )
             return {
@@ -132,6 +888,37 @@ class TranscriptionService:
                 "error": None
             }
 
+    @staticmethod
+    def _map_once_result(result: speechsdk.SpeechRecognitionResult) -> Dict[str, Optional[str]]:
+        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            auto_detect_result = speechsdk.AutoDetectSourceLanguageResult(result)
+            return {
+                "language": auto_detect_result.language,
+                "text": result.text,
+                "status": "completed",
+                "error": None
+            }
+        else:
+            error_reason = result.cancellation_details.reason if result.reason == speechsdk.ResultReason.Canceled else result.reason
+            logger.warning(f"Stream (once) recognition ended: {error_reason}")
+            return {
+                "language": None, "text": None,
+                "status": "no_match_or_error", "error": f"Stream (once) ended: {error_reason}"
+            }
+
+    async def recognize_from_session(self, session: OnceSession) -> Dict[str, Optional[str]]:
+        """ Performs a single recognition on a (pre-warmed) pooled session. """
+        try:
+            loop = asyncio.get_event_loop()
+            result = await loop.run_in_executor(self._sdk_executor, session.recognizer.recognize_once)
+            return self._map_once_result(result)
+        except Exception as e:
+            logger.error("stream_recognition_failed (once)", error=str(e), exc_info=True)
+            return {
+                "language": None, "text": None,
+                "status": "failed", "error": str(e)
+            }
+
     async def recognize_from_stream(
         self,
         stream: speechsdk.audio.PushAudioInputStream
@@ -141,32 +928,17 @@ class TranscriptionService:
         try:
             speech_config = self._get_speech_config()
             audio_config = speechsdk.audio.AudioConfig(stream=stream)
-            
+
             recognizer = speechsdk.SpeechRecognizer(
                 speech_config=speech_config,
                 auto_detect_source_language_config=self.auto_detect_config,
                 audio_config=audio_config
             )
-            
+
             loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, recognizer.recognize_once)
-            
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                auto_detect_result = speechsdk.AutoDetectSourceLanguageResult(result)
-                return {
-                    "language": auto_detect_result.language,
-                    "text": result.text,
-                    "status": "completed",
-                    "error": None
-                }
-            else:
-                 error_reason = result.cancellation_details.reason if result.reason == speechsdk.ResultReason.Canceled else result.reason
-                 logger.warning(f"Stream (once) recognition ended: {error_reason}")
-                 return {
-                    "language": None, "text": None,
-                    "status": "no_match_or_error", "error": f"Stream (once) ended: {error_reason}"
-                 }
-            
+            result = await loop.run_in_executor(self._sdk_executor, recognizer.recognize_once)
+            return self._map_once_result(result)
+
         except Exception as e:
             logger.error("stream_recognition_failed (once)", error=str(e), exc_info=True)
             return {
@@ -176,65 +948,121 @@ class TranscriptionService:
     
     async def recognize_continuous(
         self,
-        stream: speechsdk.audio.PushAudioInputStream,
-        callback # This callback must be an async function
+        stream, # PushAudioInputStream or a facade (QueuePullAudioStream, BoundedPushInputStream)
+        callback, # This callback must be an async function
+        emit_partials: bool = True
     ) -> speechsdk.SpeechRecognizer:
-        """ Sets up continuous recognition for a WebSocket stream. """
-        # This function remains largely unchanged
+        """
+        Sets up continuous recognition for a WebSocket stream.
+
+        With emit_partials enabled (default), intermediate hypotheses from
+        the SDK's `recognizing` event are forwarded with status "partial",
+        so clients see text within ~200 ms instead of waiting for the
+        end-of-phrase silence timeout.
+        """
         recognizer = None # Define recognizer in the broader scope
         try:
             speech_config = self._get_speech_config()
-            audio_config = speechsdk.audio.AudioConfig(stream=stream)
-            
+            # Callers may hand us a BoundedPushInputStream facade; the SDK
+            # itself needs the underlying push stream.
+            audio_config = speechsdk.audio.AudioConfig(
+                stream=getattr(stream, "azure_stream", stream)
+            )
+
             recognizer = speechsdk.SpeechRecognizer(
                 speech_config=speech_config,
                 auto_detect_source_language_config=self.auto_detect_config,
                 audio_config=audio_config
             )
-            
+
             loop = asyncio.get_event_loop()
-            
+
+            # SDK handlers fire on SDK threads. Instead of scheduling a new
+            # coroutine per event via run_coroutine_threadsafe (one Future
+            # allocation each), they push payloads into a bounded queue that
+            # a single consumer task drains. The consumer preserves event
+            # ordering and applies backpressure; on overflow the oldest
+            # pending payload is dropped so the session keeps up.
+            event_queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+
+            def _enqueue(payload: dict):
+                try:
+                    event_queue.put_nowait(payload)
+                except asyncio.QueueFull:
+                    try:
+                        dropped = event_queue.get_nowait()
+                        logger.warning(
+                            "recognition_event_dropped",
+                            status=dropped.get("status")
+                        )
+                    except asyncio.QueueEmpty:
+                        pass
+                    event_queue.put_nowait(payload)
+
+            async def _drain():
+                while True:
+                    payload = await event_queue.get()
+                    try:
+                        await callback(payload)
+                    except Exception as cb_err:
+                        logger.error("recognition_callback_failed", error=str(cb_err))
+                    if payload["status"] in ("stopped", "error"):
+                        break
+
             def recognized_handler(evt):
                 if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+                    if isinstance(stream, BoundedPushInputStream):
+                        # Credit the audio the service has confirmed so the
+                        # producer-side buffer bound tracks real consumption.
+                        stream.mark_consumed(evt.result.offset + evt.result.duration)
                     auto_detect_result = speechsdk.AutoDetectSourceLanguageResult(evt.result)
-                    # Schedule the async callback to run in the event loop
-                    asyncio.run_coroutine_threadsafe(
-                        callback({
-                            "language": auto_detect_result.language,
-                            "text": evt.result.text,
-                            "status": "recognized",
-                            "error": None
-                        }),
-                        loop
-                    )
+                    loop.call_soon_threadsafe(_enqueue, {
+                        "language": auto_detect_result.language,
+                        "text": evt.result.text,
+                        "status": "recognized",
+                        "error": None
+                    })
                 elif evt.result.reason == speechsdk.ResultReason.NoMatch:
-                     logger.debug("Continuous recognition (stream): NoMatch")
+                     if _DEBUG_LOGGING:
+                         logger.debug("Continuous recognition (stream): NoMatch")
+
+            def recognizing_handler(evt):
+                # Intermediate hypothesis; offset lets the client reconcile
+                # partial -> final transitions for the same utterance.
+                if evt.result.text:
+                    loop.call_soon_threadsafe(_enqueue, {
+                        "language": None,
+                        "text": evt.result.text,
+                        "status": "partial",
+                        "offset": evt.result.offset,
+                        "error": None
+                    })
 
             def canceled_handler(evt):
                 error_msg = f"Continuous recognition (stream) canceled: {evt.reason}"
                 if evt.reason == speechsdk.CancellationReason.Error:
                      error_msg += f" - Details: {evt.error_details}"
                 logger.warning(error_msg)
-                asyncio.run_coroutine_threadsafe(
-                     callback({"status": "error", "error": error_msg}),
-                     loop
-                )
+                loop.call_soon_threadsafe(_enqueue, {"status": "error", "error": error_msg})
 
             def session_stopped_handler(evt):
                 logger.info("Continuous recognition session stopped (stream).")
-                asyncio.run_coroutine_threadsafe(
-                    callback({"status": "stopped", "error": None}),
-                    loop
-                )
+                loop.call_soon_threadsafe(_enqueue, {"status": "stopped", "error": None})
 
             # Connect handlers
             recognizer.recognized.connect(recognized_handler)
+            if emit_partials:
+                recognizer.recognizing.connect(recognizing_handler)
             recognizer.canceled.connect(canceled_handler)
             recognizer.session_stopped.connect(session_stopped_handler)
-            recognizer.session_started.connect(lambda evt: logger.info("Session started (stream)", event=str(evt)))
+            recognizer.session_started.connect(lambda evt: logger.info("Session started (stream)"))
             
+            # Single consumer draining the event queue; exits on the
+            # terminal stopped/error payload.
+            asyncio.ensure_future(_drain())
+
             # Start recognition (non-blocking)
-            await loop.run_in_executor(None, recognizer.start_continuous_recognition)
+            await loop.run_in_executor(self._sdk_executor, recognizer.start_continuous_recognition)
             logger.info("Continuous recognition started (stream).")
 
             return recognizer # Return the recognizer so it can be stopped later
@@ -245,5 +1073,17 @@ class TranscriptionService:
             await callback({"status": "error", "error": f"Setup failed: {str(e)}"})
             raise # Re-raise the exception
 
+    async def stop_recognizer(self, recognizer: speechsdk.SpeechRecognizer) -> None:
+        """
+        Stops continuous recognition without tying up the loop's default
+        executor. stop_continuous_recognition_async() returns immediately
+        with a ResultFuture; only the final get() blocks, and that runs on
+        the dedicated SDK executor so mass disconnects do not thrash the
+        default thread pool.
+        """
+        fut = recognizer.stop_continuous_recognition_async()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._sdk_executor, fut.get)
+
 # Single instance
 transcription_service = TranscriptionService()
\ No newline at end of file
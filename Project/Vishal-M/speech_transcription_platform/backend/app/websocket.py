@@ -1,16 +1,256 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, WebSocketException
 import azure.cognitiveservices.speech as speechsdk
+import orjson
 import asyncio
+import collections
+import io
 import subprocess
+import sys
+import threading
 import os  # <-- Import the 'os' module
 from typing import Optional
 
-from .transcription import transcription_service
+try:
+    # Optional in-process decode: PyAV wraps libav, so Opus/WebM from the
+    # browser can be decoded without a child process, pipes, or drain
+    # bookkeeping. The ffmpeg subprocess pool is the fallback when PyAV
+    # is not installed.
+    import av
+except ImportError:
+    av = None
+
+from .transcription import transcription_service, QueuePullAudioStream, FdPullAudioStream
+from .config import get_settings
 from .logger import get_logger
 
 router = APIRouter(prefix="/ws", tags=["websocket"])
+settings = get_settings()
 logger = get_logger(__name__)
 
+# FFmpeg invocation shared by both endpoints: decode whatever the client
+# sends (likely webm/opus) on stdin to raw 16 kHz mono PCM on stdout.
+_FFMPEG_COMMAND = (
+    "ffmpeg",
+    "-loglevel", "error",   # Errors only: stderr is discarded anyway
+    "-nostats",
+    "-hide_banner",
+    "-i", "pipe:0",         # Input from stdin
+    "-f", "s16le",          # Output format: signed 16-bit little-endian PCM
+    "-acodec", "pcm_s16le", # Audio codec
+    "-ar", "16000",         # Sample rate
+    "-ac", "1",             # Mono channel
+    "pipe:1"                # Output to stdout
+)
+
+# --- FIX FOR RENDER DEPLOYMENT (Issue #2) ---
+# `CREATE_NO_WINDOW` is a Windows-only flag; apply it only there.
+_CREATION_FLAGS = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+
+# On Linux the SDK can pull decoded PCM straight from ffmpeg's stdout
+# pipe fd (see FdPullAudioStream), cutting the asyncio reader task and
+# its copies out of the audio path. Other platforms keep the
+# StreamReader path.
+_FD_PULL = sys.platform == "linux"
+
+if _FD_PULL:
+    import fcntl
+    _F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+
+def _enlarge_pipe(fd: int):
+    """
+    Best-effort: grow a pipe to 1 MiB. The Linux default of 64 KiB holds
+    only ~2 s of 16 kHz s16le audio, so bursts block the producer; a
+    bigger kernel buffer absorbs them with fewer block/wake cycles.
+    """
+    try:
+        fcntl.fcntl(fd, _F_SETPIPE_SZ, 1 << 20)
+    except OSError:
+        pass # Above pipe-max-size or unprivileged; the default still works
+
+# Raw PCM format the decoders emit. Constructing it crosses into the
+# SDK's native wrapper, so build it once rather than per connection.
+_AUDIO_FORMAT = speechsdk.audio.AudioStreamFormat(
+    samples_per_second=16000, bits_per_sample=16, channels=1
+)
+
+class _FFmpegPool:
+    """
+    Pool of pre-spawned ffmpeg decoder processes.
+
+    A piped ffmpeg decode cannot be reused once its stdin reaches EOF, so
+    rather than recycling processes the pool keeps a few already-forked
+    idle decoders ready and refills in the background after each lease.
+    That moves the ~50-150 ms fork+exec+codec-init off the connection's
+    critical path and smooths fork storms under client bursts.
+    """
+    def __init__(self, size: int):
+        self._size = size
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._filling = False
+
+    @staticmethod
+    async def _spawn():
+        if _FD_PULL:
+            # Hand ffmpeg a raw pipe for stdout; the read end (pcm_fd) is
+            # later consumed by the SDK's pull callback, so asyncio never
+            # touches the PCM leg.
+            rfd, wfd = os.pipe()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *_FFMPEG_COMMAND,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=wfd,
+                    stderr=asyncio.subprocess.DEVNULL,
+                    creationflags=_CREATION_FLAGS,
+                    limit=1 << 20
+                )
+            except Exception:
+                os.close(rfd)
+                raise
+            finally:
+                os.close(wfd) # Child keeps its own duplicate
+            process.pcm_fd = rfd
+            _enlarge_pipe(rfd)
+            try:
+                _enlarge_pipe(
+                    process.stdin.transport.get_extra_info("pipe").fileno()
+                )
+            except (AttributeError, ValueError):
+                pass # Transport exposes no raw pipe; keep the default size
+            return process
+        return await asyncio.create_subprocess_exec(
+            *_FFMPEG_COMMAND,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            # No stderr pipe: draining it cost a dedicated task and a
+            # formatted log record per ffmpeg line, per connection
+            stderr=asyncio.subprocess.DEVNULL,
+            creationflags=_CREATION_FLAGS,
+            limit=1 << 20  # StreamReader buffer large enough for 64 KiB reads
+        )
+
+    async def acquire(self):
+        try:
+            process = self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            process = await self._spawn()
+        else:
+            if process.returncode is not None: # Died while idle
+                process = await self._spawn()
+        self._schedule_fill()
+        return process
+
+    def _schedule_fill(self):
+        if not self._filling:
+            self._filling = True
+            asyncio.ensure_future(self._fill())
+
+    async def _fill(self):
+        try:
+            while self._idle.qsize() < self._size:
+                self._idle.put_nowait(await self._spawn())
+        except Exception as e:
+            logger.warning("ffmpeg_pool_fill_failed", error=str(e))
+        finally:
+            self._filling = False
+
+    async def release(self, process):
+        """ Reaps a leased decoder (they are single-stream, never reused). """
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        await process.wait()
+        # Close the pull fd unless a stream already took ownership of it
+        fd = getattr(process, "pcm_fd", None)
+        if fd is not None:
+            process.pcm_fd = None
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+_ffmpeg_pool = _FFmpegPool(
+    size=min((os.cpu_count() or 2) * 2, settings.MAX_CONCURRENT_STREAMS)
+)
+
+class _ByteFeed(io.RawIOBase):
+    """
+    Blocking byte source bridging WebSocket frames into PyAV's demuxer.
+
+    The decode runs on a worker thread, so read() may block until the
+    event loop feeds more bytes or signals end-of-stream.
+    """
+    def __init__(self):
+        super().__init__()
+        self._chunks = collections.deque()
+        self._cond = threading.Condition()
+        self._eof = False
+
+    def feed(self, data: bytes):
+        with self._cond:
+            self._chunks.append(data)
+            self._cond.notify()
+
+    def end(self):
+        with self._cond:
+            self._eof = True
+            self._cond.notify()
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        with self._cond:
+            while not self._chunks and not self._eof:
+                self._cond.wait()
+            if not self._chunks:
+                return b"" # EOF
+            chunk = self._chunks.popleft()
+            if size is not None and 0 <= size < len(chunk):
+                chunk, rest = chunk[:size], chunk[size:]
+                self._chunks.appendleft(rest)
+            return chunk
+
+class _PyAVDecoder:
+    """
+    In-process decoder: client audio in, 16 kHz mono s16 PCM out to the
+    SDK stream. Replaces the ffmpeg subprocess plus its two pipe-reader
+    tasks with a single worker thread.
+    """
+    def __init__(self, stream):
+        self._feed = _ByteFeed()
+        self._stream = stream
+        self._future = None
+
+    def start(self):
+        self._future = asyncio.get_running_loop().run_in_executor(
+            None, self._run
+        )
+
+    def write(self, data: bytes):
+        self._feed.feed(data)
+
+    async def finish(self):
+        """ Signals end of input and waits for the decode thread to drain. """
+        self._feed.end()
+        if self._future is not None:
+            await self._future
+            self._future = None
+
+    def _run(self):
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=16000)
+        try:
+            with av.open(self._feed, mode="r") as container:
+                for frame in container.decode(audio=0):
+                    for out in resampler.resample(frame):
+                        self._stream.write(bytes(out.planes[0]))
+        except Exception as e:
+            # A truncated container on client disconnect is normal; anything
+            # else is still not worth tearing the connection down for.
+            logger.warning("pyav_decode_stopped", error=str(e))
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: dict[str, WebSocket] = {}
@@ -21,8 +261,8 @@ class ConnectionManager:
         logger.info("websocket_connected", client_id=client_id)
 
     def disconnect(self, client_id: str):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
+        # Single dict probe instead of a membership check plus delete
+        if self.active_connections.pop(client_id, None) is not None:
             logger.info("websocket_disconnected", client_id=client_id)
 
 manager = ConnectionManager()
@@ -30,122 +270,212 @@ manager = ConnectionManager()
 @router.websocket("/recognize-continuous")
 async def websocket_continuous_recognition(websocket: WebSocket):
     client_id = f"continuous_{id(websocket)}"
+    # Bind once: every log call in this handler then carries client_id
+    # without re-merging kwargs per call.
+    log = logger.bind(client_id=client_id)
     await manager.connect(websocket, client_id)
 
-    stream: Optional[speechsdk.audio.PushAudioInputStream] = None
+    stream = None # QueuePullAudioStream or FdPullAudioStream
     recognizer = None
     ffmpeg_process = None
-    
+    decoder: Optional[_PyAVDecoder] = None
+    flusher_task = None
+    result_queue: asyncio.Queue = asyncio.Queue()
+    reader_tasks: list = [] # Background tasks to cancel on teardown
+
     try:
-        # Define the audio format for the Speech SDK (raw PCM)
-        audio_format = speechsdk.audio.AudioStreamFormat(samples_per_second=16000, bits_per_sample=16, channels=1)
-        stream = speechsdk.audio.PushAudioInputStream(stream_format=audio_format)
+        # Clients that can produce raw PCM (AudioWorklet, native apps)
+        # declare it with ?format=pcm16 — 16 kHz, mono, s16le — and skip
+        # the decode stage entirely: bytes go straight to the SDK stream.
+        raw_pcm = websocket.query_params.get("format", "webm") == "pcm16"
+        use_fd_pull = _FD_PULL and not raw_pcm and av is None
+
+        if use_fd_pull:
+            # Acquire the decoder up front: its stdout pipe fd becomes the
+            # SDK's pull source, so the PCM leg never crosses the event loop.
+            ffmpeg_process = await _ffmpeg_pool.acquire()
+            pcm_fd = ffmpeg_process.pcm_fd
+            ffmpeg_process.pcm_fd = None # The stream owns the fd now
+            stream = FdPullAudioStream(pcm_fd, _AUDIO_FORMAT)
+        else:
+            # Pull mode lets the SDK consume at its own rate, with the
+            # producer-side queue bounded so a service slowdown cannot grow
+            # memory without limit.
+            stream = QueuePullAudioStream(_AUDIO_FORMAT)
 
         async def send_result(result: dict):
-            try:
-                if client_id in manager.active_connections:
-                    await manager.active_connections[client_id].send_json(result)
-            except Exception as e:
-                logger.error("failed_to_send_result", error=str(e))
+            # Queued, not sent: the flusher coalesces bursts of partials
+            # into one frame instead of one TLS record per event.
+            result_queue.put_nowait(result)
+
+        async def flush_results():
+            # Drains the queue every ~20 ms and sends all pending results
+            # as a single orjson array frame. A None item means the
+            # connection is shutting down: flush what is left and exit.
+            while True:
+                item = await result_queue.get()
+                done = item is None
+                items = [] if done else [item]
+                while True:
+                    try:
+                        nxt = result_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    if nxt is None:
+                        done = True
+                    else:
+                        items.append(nxt)
+                if items:
+                    try:
+                        await websocket.send_bytes(orjson.dumps(items))
+                    except WebSocketDisconnect:
+                        return # Client went away; the receive loop will notice
+                    except Exception as e:
+                        log.error("failed_to_send_result", error=str(e))
+                        return
+                if done:
+                    return
+                await asyncio.sleep(0.02)
+
+        flusher_task = asyncio.create_task(flush_results())
+
+        stdout_task = None
+
+        async def _setup_decode():
+            # Decoder-side setup; runs concurrently with the Azure handshake
+            nonlocal decoder, ffmpeg_process, stdout_task
+            if raw_pcm:
+                return
+            if use_fd_pull:
+                # stdout is read by the SDK thread; only stdin flow control
+                # lives on the event loop.
+                ffmpeg_process.stdin.transport.set_write_buffer_limits(
+                    high=1 << 20, low=256 << 10
+                )
+                return
+            if av is not None:
+                # Decode in-process: no child process, pipes, or drain logic
+                decoder = _PyAVDecoder(stream)
+                decoder.start()
+                return
+
+            # Lease a pre-spawned decoder instead of forking one per connection
+            ffmpeg_process = await _ffmpeg_pool.acquire()
+
+            # Flow control for the WebSocket -> ffmpeg leg: buffer up to 1 MiB
+            # in the transport and only await drain() past the low-water mark,
+            # instead of paying a task switch after every client frame.
+            ffmpeg_process.stdin.transport.set_write_buffer_limits(
+                high=1 << 20, low=256 << 10
+            )
+
+            # Task to read FFmpeg's stdout (the raw audio) and push it to Azure
+            async def read_ffmpeg_stdout():
+                while True:
+                    if ffmpeg_process and ffmpeg_process.stdout:
+                        # 64 KiB reads: ~2 s of PCM per syscall/loop iteration
+                        # instead of 32 ms, so the pipe copy stops dominating
+                        data = await ffmpeg_process.stdout.read(65536)
+                        if not data:
+                            break
+                        stream.write(data) # Push data to Azure stream
+                    else:
+                        break
+                log.info("FFmpeg stdout read task finished.")
 
-        recognizer = await transcription_service.recognize_continuous(
-            stream,
-            send_result
-        )
+            stdout_task = asyncio.create_task(read_ffmpeg_stdout())
+            reader_tasks.append(stdout_task)
 
-        # FFmpeg command to convert input (likely webm/opus) to raw PCM
-        ffmpeg_command = [
-            "ffmpeg",
-            "-i", "pipe:0",        # Input from stdin
-            "-f", "s16le",         # Output format: signed 16-bit little-endian PCM
-            "-acodec", "pcm_s16le", # Audio codec
-            "-ar", "16000",        # Sample rate
-            "-ac", "1",            # Mono channel
-            "pipe:1"               # Output to stdout
-        ]
-
-        # --- FIX FOR RENDER DEPLOYMENT (Issue #2) ---
-        # `CREATE_NO_WINDOW` is a Windows-only flag.
-        # We check the OS and only apply it on Windows.
-        creation_flags = 0
-        if os.name == 'nt':  # 'nt' is the name for Windows
-            creation_flags = subprocess.CREATE_NO_WINDOW
-        # --- END OF FIX ---
-
-        ffmpeg_process = await asyncio.create_subprocess_exec(
-            *ffmpeg_command,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            creationflags=creation_flags  # <-- Apply the platform-safe flag
+        # Overlap the two independent setup latencies — the Azure SDK
+        # handshake and the decoder lease — then ack so the client knows
+        # the pipeline is ready for audio.
+        recognizer, _ = await asyncio.gather(
+            transcription_service.recognize_continuous(stream, send_result),
+            _setup_decode(),
         )
-
-        # Task to read FFmpeg's stdout (the raw audio) and push it to Azure
-        async def read_ffmpeg_stdout():
+        await websocket.send_bytes(orjson.dumps({"status": "ready"}))
+
+        # One long-lived watchdog instead of asyncio.wait_for around every
+        # receive: wait_for allocates a Task and a TimerHandle per message,
+        # the watchdog just sleeps until the deadline goes stale and then
+        # closes the socket, which unblocks receive_bytes.
+        loop = asyncio.get_running_loop()
+        idle_timeout = 30.0 # Timeout if no audio data received
+        deadline = loop.time() + idle_timeout
+        timed_out = False
+
+        async def watchdog():
+            nonlocal timed_out
             while True:
-                if ffmpeg_process and ffmpeg_process.stdout:
-                    data = await ffmpeg_process.stdout.read(1024)
-                    if not data:
-                        break
-                    stream.write(data) # Push data to Azure stream
-                else:
-                    break
-            logger.info("FFmpeg stdout read task finished.", client_id=client_id)
-
-        # Task to read FFmpeg's stderr (for debugging)
-        async def read_ffmpeg_stderr():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    timed_out = True
+                    log.warning("websocket_receive_timeout")
+                    try:
+                        await websocket.close()
+                    except Exception:
+                        pass
+                    return
+                await asyncio.sleep(remaining)
+
+        watchdog_task = asyncio.create_task(watchdog())
+        reader_tasks.append(watchdog_task)
+
+        # Main loop: Read from WebSocket (client) and write to the decoder
+        try:
             while True:
-                if ffmpeg_process and ffmpeg_process.stderr:
-                    line = await ffmpeg_process.stderr.readline()
-                    if not line:
-                        break
-                    logger.info(f"ffmpeg_stderr: {line.decode().strip()}", client_id=client_id)
-                else:
+                try:
+                    data = await websocket.receive_bytes()
+                except (WebSocketDisconnect, RuntimeError):
+                    if not timed_out:
+                        log.info("websocket_client_disconnected")
                     break
-            logger.info("FFmpeg stderr read task finished.", client_id=client_id)
-
-        stdout_task = asyncio.create_task(read_ffmpeg_stdout())
-        stderr_task = asyncio.create_task(read_ffmpeg_stderr())
-
-        # Main loop: Read from WebSocket (client) and write to FFmpeg's stdin
-        while True:
-            try:
-                data = await asyncio.wait_for(
-                    websocket.receive_bytes(),
-                    timeout=30.0 # Timeout if no audio data received
-                )
+                deadline = loop.time() + idle_timeout
                 if data:
-                    if ffmpeg_process.stdin:
+                    if raw_pcm:
+                        stream.write(data)
+                    elif decoder is not None:
+                        decoder.write(data)
+                    elif ffmpeg_process.stdin:
                         ffmpeg_process.stdin.write(data)
-                        await ffmpeg_process.stdin.drain()
+                        # drain() only when the transport reports backlog;
+                        # the write itself is buffered and non-blocking
+                        if ffmpeg_process.stdin.transport.get_write_buffer_size() >= 256 << 10:
+                            await ffmpeg_process.stdin.drain()
                     else:
-                        logger.warning("FFmpeg stdin is not available.", client_id=client_id)
+                        log.warning("FFmpeg stdin is not available.")
                         break
-            except asyncio.TimeoutError:
-                logger.warning("websocket_receive_timeout", client_id=client_id)
-                break
-            except WebSocketDisconnect:
-                logger.info("websocket_client_disconnected", client_id=client_id)
-                break
+        finally:
+            watchdog_task.cancel()
         
-        # Once WebSocket closes, close FFmpeg's stdin to signal end of stream
-        if ffmpeg_process.stdin:
+        if decoder is not None:
+            # Signal end of input and wait for the decode thread to drain
+            await decoder.finish()
+        elif ffmpeg_process is not None:
+            # Once WebSocket closes, close FFmpeg's stdin to signal end of stream
+            if ffmpeg_process.stdin:
+                try:
+                    ffmpeg_process.stdin.close()
+                    await ffmpeg_process.stdin.wait_closed()
+                except Exception as e:
+                    log.warning(f"Error closing ffmpeg stdin: {e}")
+
+            # Drain stdout and reap the process concurrently, bounded so a
+            # hung ffmpeg cannot stall the handler's return.
+            waiters = [ffmpeg_process.wait()]
+            if stdout_task is not None:
+                waiters.append(stdout_task)
             try:
-                ffmpeg_process.stdin.close()
-                await ffmpeg_process.stdin.wait_closed()
-            except Exception as e:
-                logger.warning(f"Error closing ffmpeg stdin: {e}", client_id=client_id)
-
-        # Wait for all tasks to complete
-        await stdout_task
-        await stderr_task
-        if ffmpeg_process:
-            await ffmpeg_process.wait()
-            logger.info("FFmpeg process finished.", client_id=client_id)
+                await asyncio.wait_for(
+                    asyncio.gather(*waiters, return_exceptions=True), 5.0
+                )
+                log.info("FFmpeg process finished.")
+            except asyncio.TimeoutError:
+                log.warning("ffmpeg_shutdown_timeout")
 
 
     except Exception as e:
-        logger.error("continuous_recognition_error", error=str(e), exc_info=True, client_id=client_id)
+        log.error("continuous_recognition_error", error=str(e), exc_info=True)
         try:
             await websocket.send_json({
                 "status": "error",
@@ -155,27 +485,60 @@ async def websocket_continuous_recognition(websocket: WebSocket):
             pass # Client might be disconnected
     finally:
         # --- Cleanup ---
+        # Error paths can leave the reader/watchdog tasks pending; cancel
+        # them explicitly so they are not destroyed while still running.
+        for t in reader_tasks:
+            t.cancel()
+        if reader_tasks:
+            await asyncio.gather(*reader_tasks, return_exceptions=True)
+
+        if ffmpeg_process is not None and isinstance(stream, FdPullAudioStream):
+            # Reap the decoder first so the SDK's blocking pipe read hits
+            # EOF before we wait for the recognizer to stop.
+            try:
+                await _ffmpeg_pool.release(ffmpeg_process)
+            except Exception as e:
+                log.error("Error releasing ffmpeg", error=str(e))
+            ffmpeg_process = None
+
+        if stream is not None and not isinstance(stream, FdPullAudioStream):
+            # End the queue-backed stream before waiting on stop: the SDK's
+            # pull read may be parked in Condition.wait(), and stop waits
+            # behind it — same decoder-first ordering as the fd path above.
+            stream.close()
+
         if recognizer:
             try:
-                await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    recognizer.stop_continuous_recognition
-                )
-                logger.info("Azure recognizer stopped", client_id=client_id)
+                await transcription_service.stop_recognizer(recognizer)
+                log.info("Azure recognizer stopped")
             except Exception as e:
-                logger.error("Error stopping recognizer", error=str(e), client_id=client_id)
+                log.error("Error stopping recognizer", error=str(e))
+
+        if decoder is not None:
+            try:
+                await decoder.finish()
+            except Exception:
+                pass
 
         if stream:
             stream.close()
-            logger.info("PushAudioInputStream closed", client_id=client_id)
-            
-        if ffmpeg_process and ffmpeg_process.returncode is None:
+            log.info("PushAudioInputStream closed")
+
+        if flusher_task is not None:
+            # Recognizer is stopped, so no more results can arrive; flush
+            # anything still queued (e.g. the final recognized text).
+            result_queue.put_nowait(None)
             try:
-                ffmpeg_process.kill()
-                await ffmpeg_process.wait()
-                logger.info("FFmpeg process killed", client_id=client_id)
+                await flusher_task
+            except Exception:
+                pass
+
+        if ffmpeg_process:
+            try:
+                await _ffmpeg_pool.release(ffmpeg_process)
+                log.info("FFmpeg process released")
             except Exception as e:
-                logger.error("Error killing ffmpeg", error=str(e), client_id=client_id)
+                log.error("Error releasing ffmpeg", error=str(e))
 
         manager.disconnect(client_id)
 
@@ -187,116 +550,148 @@ async def websocket_continuous_recognition(websocket: WebSocket):
 @router.websocket("/recognize-once")
 async def websocket_single_recognition(websocket: WebSocket):
     client_id = f"once_{id(websocket)}"
+    # Same pre-bound logger pattern as the continuous handler
+    log = logger.bind(client_id=client_id)
     await manager.connect(websocket, client_id)
 
     stream: Optional[speechsdk.audio.PushAudioInputStream] = None
     ffmpeg_process = None
+    decoder: Optional[_PyAVDecoder] = None
+    reader_tasks: list = [] # Background tasks to cancel on teardown
 
     try:
-        # Define audio format for raw PCM
-        audio_format = speechsdk.audio.AudioStreamFormat(samples_per_second=16000, bits_per_sample=16, channels=1)
-        stream = speechsdk.audio.PushAudioInputStream(stream_format=audio_format)
+        # Lease a pre-warmed session (stream + recognizer with an already
+        # opened connection) instead of building everything per request.
+        session = await transcription_service.acquire_once_session()
+        stream = session.stream
 
         timeout_duration = 10.0 # Max time for a "recognize once"
-        start_time = asyncio.get_event_loop().time()
-        
-        # --- FFmpeg setup for recognize-once ---
-        ffmpeg_command = [
-            "ffmpeg",
-            "-i", "pipe:0",
-            "-f", "s16le",
-            "-acodec", "pcm_s16le",
-            "-ar", "16000",
-            "-ac", "1",
-            "pipe:1"
-        ]
         
-        # --- FIX FOR RENDER DEPLOYMENT (Issue #2) ---
-        creation_flags = 0
-        if os.name == 'nt':
-            creation_flags = subprocess.CREATE_NO_WINDOW
-            
-        ffmpeg_process = await asyncio.create_subprocess_exec(
-            *ffmpeg_command,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            creationflags=creation_flags
-        )
+        # Same negotiation as the continuous endpoint: ?format=pcm16 means
+        # the client already sends 16 kHz mono s16le and needs no decode.
+        raw_pcm = websocket.query_params.get("format", "webm") == "pcm16"
 
-        # Task to read FFmpeg's stdout and push it to Azure
-        async def read_stdout_once():
+        stdout_task_once = None
+        if raw_pcm:
+            pass
+        elif av is not None:
+            # Decode in-process: no child process, pipes, or drain logic
+            decoder = _PyAVDecoder(stream)
+            decoder.start()
+        else:
+            # Lease a pre-spawned decoder instead of forking one per connection
+            ffmpeg_process = await _ffmpeg_pool.acquire()
+
+            # Same flow-control policy as the continuous handler: only await
+            # drain() once the transport buffer is past the low-water mark.
+            ffmpeg_process.stdin.transport.set_write_buffer_limits(
+                high=1 << 20, low=256 << 10
+            )
+
+            pcm_fd = getattr(ffmpeg_process, "pcm_fd", None)
+            if pcm_fd is not None:
+                # On Linux the pool spawns fd-pull decoders whose stdout is
+                # a raw pipe (process.stdout is None). This path pushes into
+                # a pooled session stream rather than pulling, so drain the
+                # fd on a worker thread and write into the push stream.
+                ffmpeg_process.pcm_fd = None # We own the fd now
+
+                def _drain_pcm_fd():
+                    try:
+                        while True:
+                            chunk = os.read(pcm_fd, 65536)
+                            if not chunk:
+                                break
+                            stream.write(chunk)
+                    finally:
+                        try:
+                            os.close(pcm_fd)
+                        except OSError:
+                            pass
+                    log.info("FFmpeg_once pcm fd drain finished.")
+
+                stdout_task_once = asyncio.get_running_loop().run_in_executor(
+                    None, _drain_pcm_fd
+                )
+            else:
+                # Task to read FFmpeg's stdout and push it to Azure
+                async def read_stdout_once():
+                    while True:
+                        if ffmpeg_process and ffmpeg_process.stdout:
+                            # 64 KiB reads: ~2 s of PCM per syscall/loop iteration
+                            # instead of 32 ms, so the pipe copy stops dominating
+                            data = await ffmpeg_process.stdout.read(65536)
+                            if not data:
+                                break
+                            stream.write(data)
+                        else:
+                            break
+                    log.info("FFmpeg_once stdout read task finished.")
+
+                stdout_task_once = asyncio.create_task(read_stdout_once())
+                reader_tasks.append(stdout_task_once)
+
+        # Read from WebSocket until timeout or disconnect
+        # Receive until the client goes quiet for 1 s or disconnects; the
+        # single outer wait_for enforces the total deadline instead of
+        # recomputing remaining time and scheduling a timer per iteration.
+        async def _pump():
             while True:
-                if ffmpeg_process and ffmpeg_process.stdout:
-                    data = await ffmpeg_process.stdout.read(1024)
-                    if not data:
-                        break
+                try:
+                    data = await asyncio.wait_for(websocket.receive_bytes(), 1.0)
+                except asyncio.TimeoutError:
+                    return # No data, proceed to recognition
+                except WebSocketDisconnect:
+                    return # Client disconnected, proceed
+                if raw_pcm:
                     stream.write(data)
+                elif decoder is not None:
+                    decoder.write(data)
+                elif ffmpeg_process.stdin:
+                    ffmpeg_process.stdin.write(data)
+                    if ffmpeg_process.stdin.transport.get_write_buffer_size() >= 256 << 10:
+                        await ffmpeg_process.stdin.drain()
                 else:
-                    break
-            logger.info("FFmpeg_once stdout read task finished.", client_id=client_id)
-        
-        # Task to log FFmpeg's stderr
-        async def read_stderr_once():
-            while True:
-                if ffmpeg_process and ffmpeg_process.stderr:
-                    line = await ffmpeg_process.stderr.readline()
-                    if not line:
-                        break
-                    logger.info(f"ffmpeg_once_stderr: {line.decode().strip()}", client_id=client_id)
-                else:
-                    break
-            logger.info("FFmpeg_once stderr read task finished.", client_id=client_id)
-        
-        stdout_task_once = asyncio.create_task(read_stdout_once())
-        stderr_task_once = asyncio.create_task(read_stderr_once())
-
-        # Read from WebSocket until timeout or disconnect
-        while True:
-            elapsed = asyncio.get_event_loop().time() - start_time
-            if elapsed >= timeout_duration:
-                logger.warning("Recognize-once timeout reached.", client_id=client_id)
-                break
+                    return
 
+        try:
+            await asyncio.wait_for(_pump(), timeout=timeout_duration)
+        except asyncio.TimeoutError:
+            log.warning("Recognize-once timeout reached.")
+        
+        if decoder is not None:
+            # Signal end of input and wait for the decode thread to drain
+            await decoder.finish()
+        elif ffmpeg_process is not None:
+            # Close FFmpeg's input
+            if ffmpeg_process.stdin:
+                try:
+                    ffmpeg_process.stdin.close()
+                    await ffmpeg_process.stdin.wait_closed()
+                except:
+                    pass
+
+            # Drain stdout and reap the process concurrently, with the
+            # same bound as the continuous handler.
+            waiters = [ffmpeg_process.wait()]
+            if stdout_task_once is not None:
+                waiters.append(stdout_task_once)
             try:
-                remaining = timeout_duration - elapsed
-                data = await asyncio.wait_for(
-                    websocket.receive_bytes(),
-                    timeout=min(remaining, 1.0)
+                await asyncio.wait_for(
+                    asyncio.gather(*waiters, return_exceptions=True), 5.0
                 )
-                if ffmpeg_process.stdin:
-                    ffmpeg_process.stdin.write(data)
-                    await ffmpeg_process.stdin.drain()
-                else:
-                    break
             except asyncio.TimeoutError:
-                break # No data, proceed to recognition
-            except WebSocketDisconnect:
-                break # Client disconnected, proceed
-        
-        # Close FFmpeg's input
-        if ffmpeg_process.stdin:
-            try:
-                ffmpeg_process.stdin.close()
-                await ffmpeg_process.stdin.wait_closed()
-            except:
-                pass
-        
-        # Wait for FFmpeg to finish processing
-        await stdout_task_once
-        await stderr_task_once
-        if ffmpeg_process:
-            await ffmpeg_process.wait()
+                log.warning("ffmpeg_shutdown_timeout")
 
         # Close the stream to Azure *after* FFmpeg is done
         stream.close()
 
         # Get the result from Azure
-        result = await transcription_service.recognize_from_stream(stream)
-        await websocket.send_json(result)
+        result = await transcription_service.recognize_from_session(session)
+        await websocket.send_bytes(orjson.dumps(result))
 
     except Exception as e:
-        logger.error("single_recognition_error", error=str(e), exc_info=True, client_id=client_id)
+        log.error("single_recognition_error", error=str(e), exc_info=True)
         try:
             await websocket.send_json({
                 "status": "error",
@@ -306,18 +701,30 @@ async def websocket_single_recognition(websocket: WebSocket):
             pass
     finally:
         # --- Cleanup ---
+        # Error paths can leave the reader task pending; cancel it
+        # explicitly so it is not destroyed while still running.
+        for t in reader_tasks:
+            t.cancel()
+        if reader_tasks:
+            await asyncio.gather(*reader_tasks, return_exceptions=True)
+
+        if decoder is not None:
+            try:
+                await decoder.finish()
+            except Exception:
+                pass
+
         if stream:
             try:
                 stream.close()
             except Exception:
                 pass
-                
-        if ffmpeg_process and ffmpeg_process.returncode is None:
+
+        if ffmpeg_process:
             try:
-                ffmpeg_process.kill()
-                await ffmpeg_process.wait()
+                await _ffmpeg_pool.release(ffmpeg_process)
             except Exception as e:
-                logger.error("Error killing ffmpeg_once", error=str(e), client_id=client_id)
+                log.error("Error releasing ffmpeg_once", error=str(e))
 
         manager.disconnect(client_id)
 
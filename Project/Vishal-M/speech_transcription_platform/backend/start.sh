@@ -3,5 +3,6 @@
 # Run database migrations
 alembic upgrade head
 
-# Start the application
-uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 4
+# Start the application (uvloop: markedly faster event loop for the
+# websocket/pipe-heavy streaming paths)
+uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 4 --loop uvloop --http httptools --ws websockets
@@ -10,6 +10,7 @@ export function useWebSocket(url, options = {}) {
     if (!url || wsRef.current) return // Don't connect if no URL or already connected/connecting
 
     const ws = new WebSocket(url)
+    ws.binaryType = 'arraybuffer' // Server sends results as binary JSON frames
     wsRef.current = ws
 
     ws.onopen = () => {
@@ -18,11 +19,17 @@ export function useWebSocket(url, options = {}) {
       onOpen?.()
     }
 
+    const decoder = new TextDecoder()
     ws.onmessage = (event) => {
       try {
-        const data = JSON.parse(event.data)
-        setLastMessage(data)
-        onMessage?.(data)
+        const text = event.data instanceof ArrayBuffer ? decoder.decode(event.data) : event.data
+        const parsed = JSON.parse(text)
+        // The server batches results into array frames; deliver each one
+        const batch = Array.isArray(parsed) ? parsed : [parsed]
+        for (const data of batch) {
+          setLastMessage(data)
+          onMessage?.(data)
+        }
       } catch (e) {
         console.error("Failed to parse WebSocket message:", e);
         // Handle non-JSON messages or errors if necessary
@@ -62,6 +62,7 @@ export default function LiveTranscription() {
 
       console.log(`Connecting to WebSocket at ${WS_URL}`); // Debug log
       wsRef.current = new WebSocket(WS_URL)
+      wsRef.current.binaryType = 'arraybuffer' // Server sends binary JSON frames
 
       wsRef.current.onopen = () => {
         console.log("WebSocket connection opened."); // Debug log
@@ -97,23 +98,42 @@ export default function LiveTranscription() {
         }
       }
 
+      const frameDecoder = new TextDecoder()
       wsRef.current.onmessage = (event) => {
         try {
-            const data = JSON.parse(event.data)
-            // console.log("Received WebSocket message:", data); // Debug log
-            if (data.text) {
-              setTranscript(prev => [...prev, {
-                text: data.text,
-                language: data.language,
-                timestamp: new Date().toISOString() // Add timestamp for rendering key/info
-              }])
-              setCurrentLanguage(data.language)
-            }
-            if (data.status === 'error') {
-              console.error("Received error from backend:", data.error); // Log backend errors
-              setError(`Backend Error: ${data.error}`)
-              // Optionally stop recording on certain errors
-              // stopRecording();
+            const text = event.data instanceof ArrayBuffer ? frameDecoder.decode(event.data) : event.data
+            const parsed = JSON.parse(text)
+            // The server batches results into array frames; a bare object
+            // (e.g. the initial {status: "ready"} ack) is a batch of one
+            const batch = Array.isArray(parsed) ? parsed : [parsed]
+            for (const data of batch) {
+              // console.log("Received WebSocket message:", data); // Debug log
+              if (data.text) {
+                const isPartial = data.status === 'partial'
+                setTranscript(prev => {
+                  // A partial hypothesis replaces the previous partial for the
+                  // same utterance; the final result overwrites it in place.
+                  const next = prev.length > 0 && prev[prev.length - 1].partial
+                    ? prev.slice(0, -1)
+                    : [...prev]
+                  next.push({
+                    text: data.text,
+                    language: data.language,
+                    partial: isPartial,
+                    timestamp: new Date().toISOString() // Add timestamp for rendering key/info
+                  })
+                  return next
+                })
+                if (!isPartial) {
+                  setCurrentLanguage(data.language)
+                }
+              }
+              if (data.status === 'error') {
+                console.error("Received error from backend:", data.error); // Log backend errors
+                setError(`Backend Error: ${data.error}`)
+                // Optionally stop recording on certain errors
+                // stopRecording();
+              }
             }
         } catch (parseError) {
              console.error("Failed to parse WebSocket message:", event.data, parseError);